@@ -1,3 +1,3 @@
-from .commands import run_cli
+from .commands import CLIContext, run_cli
 
-__all__ = ["run_cli"]
+__all__ = ["CLIContext", "run_cli"]
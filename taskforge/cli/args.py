@@ -29,6 +29,13 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Continue executing independent tasks after failure",
     )
+    run.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=1,
+        help="Maximum number of tasks to run concurrently (0: one per CPU)",
+    )
 
     # list
     subparsers.add_parser("list", help="List tasks")
@@ -37,3 +44,16 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers.add_parser("graph", help="Show dependency graph")
 
     return parser
+
+
+def _jobs(value: str) -> int | None:
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {n}")
+
+    # None lets the executor size the pool from the CPU count
+    return n or None
@@ -2,26 +2,56 @@ from __future__ import annotations
 
 import argparse
 import sys
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from taskforge.config import ConfigError, load_project
-from taskforge.executor import Executor, RunResult
-from taskforge.graph import GraphError, TaskGraph
+from taskforge.graph.types import GraphError
 
 from .args import build_parser
 
+# The executor and graph are imported on first use so `--help`, `list` and
+# `graph` don't pay for subprocess/thread-pool machinery they never touch
+if TYPE_CHECKING:
+    from taskforge.config import ProjectConfig
+    from taskforge.executor import RunResult
+    from taskforge.graph import TaskGraph
 
-def run_cli(argv: list[str] | None = None) -> int:
+
+# Loads the project and its graph lazily, at most once per context
+class CLIContext:
+    def __init__(self, cfg_path: str | Path):
+        self.cfg_path = cfg_path
+
+    @cached_property
+    def project(self) -> ProjectConfig:
+        return load_project(self.cfg_path)
+
+    @cached_property
+    def graph(self) -> TaskGraph:
+        from taskforge.graph import TaskGraph
+
+        return TaskGraph.from_project(self.project)
+
+
+# Passing the same ctx to several calls (an embedding tool, a REPL) loads the
+# project and builds its graph only once across them. A ctx for another
+# config than --config is not reused.
+def run_cli(argv: list[str] | None = None, ctx: CLIContext | None = None) -> int:
     parser = build_parser()
     try:
         args = parser.parse_args(argv)
+        if ctx is None or Path(ctx.cfg_path) != Path(args.config):
+            ctx = CLIContext(args.config)
 
         match args.command:
             case "run":
-                return cmd_run(args)
+                return cmd_run(args, ctx)
             case "list":
-                return cmd_list(args)
+                return cmd_list(args, ctx)
             case "graph":
-                return cmd_graph(args)
+                return cmd_graph(args, ctx)
             case _:
                 return 2
 
@@ -33,32 +63,37 @@ def run_cli(argv: list[str] | None = None) -> int:
         return 130
 
 
-def cmd_run(args: argparse.Namespace) -> int:
-    rr = _run_with(args)
+def cmd_run(args: argparse.Namespace, ctx: CLIContext) -> int:
+    rr = _run_with(args, ctx)
     _print_result(rr)
     return 1 if rr.failed else 0
 
 
-def cmd_list(args: argparse.Namespace) -> int:
-    project = load_project(args.config)
-    for tid in project.tasks_ids():
-        print(tid)
+def cmd_list(args: argparse.Namespace, ctx: CLIContext) -> int:
+    project = ctx.project
+    sys.stdout.write("\n".join(project.tasks_ids()) + "\n")
     return 0
 
 
-def cmd_graph(args: argparse.Namespace) -> int:
-    project = load_project(args.config)
-    for tid in project.tasks_ids():
-        task = project.get_task(tid)
-        deps = " ".join(sorted(task.deps))
-        print(f"{tid}: {deps}".rstrip())
+def cmd_graph(args: argparse.Namespace, ctx: CLIContext) -> int:
+    project = ctx.project
+    lines = []
+    for task in project:
+        if task.deps:
+            lines.append(f"{task.id}: {' '.join(sorted(task.deps))}")
+        else:
+            lines.append(f"{task.id}:")
+    sys.stdout.write("\n".join(lines) + "\n")
     return 0
 
 
-def _run_with(args: argparse.Namespace) -> RunResult:
-    project = load_project(args.config)
-    graph = TaskGraph.from_project(project)
-    executor = Executor(project, graph)
+def _run_with(args: argparse.Namespace, ctx: CLIContext) -> RunResult:
+    from taskforge.executor import Executor
+
+    project = ctx.project
+    graph = ctx.graph
+    # Task output is not printed, so let it go straight to the terminal
+    executor = Executor(project, graph, max_workers=args.jobs, capture=False)
     fail_fast = not args.no_fail_fast
     targets: list[str] = args.targets
 
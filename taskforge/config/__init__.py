@@ -1,4 +1,10 @@
-from .loader import load_project
+from .loader import clear_project_cache, load_project
 from .types import ConfigError, ProjectConfig, TaskConfig
 
-__all__ = ["load_project", "ProjectConfig", "TaskConfig", "ConfigError"]
+__all__ = [
+    "load_project",
+    "clear_project_cache",
+    "ProjectConfig",
+    "TaskConfig",
+    "ConfigError",
+]
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+
+from taskforge import __version__
+
+from .types import ProjectConfig, TaskConfig
+
+# Set to any non-empty value to disable the on-disk cache
+NO_CACHE_ENV = "TASKFORGE_NO_CACHE"
+
+# Bytes of the config hashed into the stamp, on top of mtime and size
+HEAD_SIZE = 4096
+
+# Bump whenever the pickled config types change shape
+_FORMAT_VERSION = 3
+
+_Stamp = tuple[int, int, str]
+
+
+def cache_enabled() -> bool:
+    return not os.environ.get(NO_CACHE_ENV)
+
+
+def cache_dir() -> Path:
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "taskforge"
+
+
+def read_disk_cache(path: Path, st: os.stat_result) -> ProjectConfig | None:
+    cache_file = _cache_file(path)
+    try:
+        cached_stamp, project = pickle.loads(cache_file.read_bytes())
+        # Only an existing entry is worth opening the config for
+        with open(path, "rb") as f:
+            stamp = _stamp(st, f.read(HEAD_SIZE))
+    except Exception:
+        # Missing, corrupt or incompatible entries are just a miss
+        return None
+
+    if cached_stamp != stamp or not _well_formed(project):
+        return None
+
+    return project
+
+
+def write_disk_cache(
+    path: Path, st: os.stat_result, head: bytes, project: ProjectConfig
+) -> None:
+    # `head` is the first HEAD_SIZE bytes the caller already read, so writing
+    # an entry never reopens the config
+    import tempfile
+
+    cache_file = _cache_file(path)
+    try:
+        data = pickle.dumps((_stamp(st, head), project), protocol=5)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent runs never read a partial entry
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, cache_file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        # The cache is an optimization, a read-only home must not break loads
+        pass
+
+
+def _well_formed(project: object) -> bool:
+    # Unpickling an older layout can "succeed" with garbage fields
+    return (
+        isinstance(project, ProjectConfig)
+        and isinstance(project.tasks, dict)
+        and all(isinstance(task, TaskConfig) for task in project.tasks.values())
+    )
+
+
+def _cache_file(path: Path) -> Path:
+    # Entries written by another format or release are never even read
+    key = f"{_FORMAT_VERSION}:{__version__}:{path}"
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return cache_dir() / f"{name}.pkl"
+
+
+def _stamp(st: os.stat_result, head: bytes) -> _Stamp:
+    # mtime alone can be preserved or spoofed, so also hash the file's head
+    digest = hashlib.sha1(head).hexdigest()
+    return st.st_mtime_ns, st.st_size, digest
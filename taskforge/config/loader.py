@@ -1,65 +1,132 @@
-import json
-import tomllib
+import mmap
+import os
+import re
+import stat
+import sys
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import cache
 from pathlib import Path
-from typing import Any, Callable, Mapping
-
-import yaml
+from typing import Any, Callable, Iterator, Mapping
 
+from .cache import HEAD_SIZE, cache_enabled, read_disk_cache, write_disk_cache
 from .types import ConfigError, ProjectConfig, TaskConfig, UnsupportedConfigFormatError
 
+# Resolved path -> (st_mtime_ns, st_size, project) of the last successful load,
+# least recently used first
+_PROJECT_CACHE: OrderedDict[Path, tuple[int, int, ProjectConfig]] = OrderedDict()
+_PROJECT_CACHE_SIZE = 64
+
+_ALLOWED_TASK_FIELDS: frozenset[str] = frozenset(
+    {"command", "deps", "env", "working_dir"}
+)
+
+# YAML files above this size are memory-mapped instead of read into memory
+_MMAP_THRESHOLD = 64 * 1024
+
+_POSITION_RE = re.compile(r"line (\d+), column (\d+)")
+
 
 def load_project(path: str | Path) -> ProjectConfig:
     pure_path = Path(path).expanduser().resolve()
 
-    if not pure_path.exists():
-        raise ConfigError(f"Config file not found: {pure_path}")
+    # One stat answers existence, file type and the cache key
+    try:
+        st = os.stat(pure_path)
+    except OSError:
+        raise ConfigError(f"Config file not found: {pure_path}") from None
 
-    if not pure_path.is_file():
+    if not stat.S_ISREG(st.st_mode):
         raise ConfigError(f"Config path is not a file: {pure_path}")
 
-    fmt = _detect_format(pure_path)
-    raw_file = _parse_file(pure_path, fmt)
-    project = _build_project_config(raw_file)
+    suffix = pure_path.suffix.lower()
+    parser = _PARSERS.get(suffix)
+    if parser is None:
+        raise UnsupportedConfigFormatError(
+            f"Non supported file extension: {pure_path.suffix}\n Expected format: .yml/.yaml, .toml, .json"
+        )
+
+    cached = _PROJECT_CACHE.get(pure_path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        _PROJECT_CACHE.move_to_end(pure_path)
+        return cached[2]
+
+    use_disk = cache_enabled()
+    project = read_disk_cache(pure_path, st) if use_disk else None
+    if project is None:
+        # Only LibYAML can stream from a mapping; json and toml parsers need
+        # a complete bytes object, so mapping would just add a copy
+        streaming = suffix in _STREAMING_SUFFIXES
+        with _read_source(pure_path, st.st_size, streaming=streaming) as data:
+            raw_file = parser(pure_path, data)
+            head = data[:HEAD_SIZE]
+        project = _build_project_config(raw_file)
+        if use_disk:
+            write_disk_cache(pure_path, st, head, project)
+
+    _PROJECT_CACHE[pure_path] = (st.st_mtime_ns, st.st_size, project)
+    _PROJECT_CACHE.move_to_end(pure_path)
+    if len(_PROJECT_CACHE) > _PROJECT_CACHE_SIZE:
+        _PROJECT_CACHE.popitem(last=False)
     return project
 
 
-def _detect_format(path: Path) -> str:
-    fmt = path.suffix
-    match fmt:
-        case ".yaml" | ".yml":
-            return "yaml"
-        case ".toml":
-            return "toml"
-        case ".json":
-            return "json"
-        case _:
-            raise UnsupportedConfigFormatError(
-                f"Non supported file extension: {fmt}\n Expected format: .yml/.yaml, .toml, .json"
-            )
+def clear_project_cache() -> None:
+    _PROJECT_CACHE.clear()
+
+
+# Parsers receive the raw file contents: bytes, or for large YAML files a
+# read-only mmap. Parser libraries are imported on first use, so e.g. a
+# JSON-only project never pays for PyYAML.
+_Source = bytes | mmap.mmap
+
+
+def _parse_yaml(path: Path, data: _Source) -> Mapping[str, Any]:
+    import yaml
+
+    # LibYAML reads an mmap as a stream, without a full in-memory copy
+    return _parse_with(path, data, _yaml_loads, yaml.YAMLError, "YAML")
 
 
-def _parse_file(path: Path, fmt: str) -> Mapping[str, Any]:
-    match fmt:
-        case "yaml":
-            return _parse_with(path, yaml.safe_load, yaml.YAMLError, "YAML")
-        case "toml":
-            return _parse_with(path, tomllib.loads, tomllib.TOMLDecodeError, "TOML")
-        case "json":
-            return _parse_with(path, json.loads, json.JSONDecodeError, "JSON")
-        case _:
-            raise AssertionError("Unreachable")
+def _parse_toml(path: Path, data: _Source) -> Mapping[str, Any]:
+    loads, error = _toml_backend()
+    return _parse_with(
+        path, data, lambda buf: loads(bytes(buf).decode("utf-8")), error, "TOML"
+    )
+
+
+def _parse_json(path: Path, data: _Source) -> Mapping[str, Any]:
+    loads, error = _json_backend()
+    return _parse_with(path, data, lambda buf: loads(bytes(buf)), error, "JSON")
+
+
+_PARSERS: dict[str, Callable[[Path, _Source], Mapping[str, Any]]] = {
+    ".yaml": _parse_yaml,
+    ".yml": _parse_yaml,
+    ".toml": _parse_toml,
+    ".json": _parse_json,
+}
+
+# Formats whose parser accepts a read-only mmap
+_STREAMING_SUFFIXES = frozenset({".yaml", ".yml"})
 
 
 def _parse_with(
     path: Path,
-    parse_fn: Callable[[str], Any],
+    data: _Source,
+    parse_fn: Callable[[_Source], Any],
     exc_types: type[Exception] | tuple[type[Exception], ...],
     label: str,
 ) -> Mapping[str, Any]:
     try:
-        raw_file = parse_fn(path.read_text(encoding="utf-8"))
+        raw_file = parse_fn(data)
     except exc_types as exc:
-        raise ConfigError(f"{path}: invalid {label}") from exc
+        line, column = _error_position(exc)
+        where = f" at line {line}, column {column}" if line is not None else ""
+        raise ConfigError(
+            f"{path}: invalid {label}{where}", path=path, line=line, column=column
+        ) from exc
 
     if not isinstance(raw_file, Mapping):
         raise ConfigError(
@@ -69,10 +136,110 @@ def _parse_with(
     return raw_file
 
 
+def _error_position(exc: Exception) -> tuple[int | None, int | None]:
+    # Taken from the parser's own exception, never by parsing a second time
+    mark = getattr(exc, "problem_mark", None)  # PyYAML, 0-based
+    if mark is not None:
+        return mark.line + 1, mark.column + 1
+
+    line = getattr(exc, "lineno", None)  # json, orjson and tomllib from 3.14
+    if line is not None:
+        return line, getattr(exc, "colno", None)
+
+    # Older tomllib only has the position in its message
+    match = _POSITION_RE.search(str(exc))
+    if match is not None:
+        return int(match[1]), int(match[2])
+
+    return None, None
+
+
+@contextmanager
+def _read_source(path: Path, size: int, *, streaming: bool) -> Iterator[_Source]:
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if not streaming or size <= _MMAP_THRESHOLD:
+            buf = None
+            data = _read_fd(fd, size)
+        else:
+            # Large files are mapped so a streaming parser can pull pages from
+            # the page cache instead of a full in-memory copy of the file
+            buf = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+    if buf is None:
+        yield data
+        return
+
+    try:
+        yield buf
+    finally:
+        buf.close()
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    # One read sized from stat() instead of going through buffered IO
+    data = os.read(fd, size + 1)
+    if len(data) > size:
+        # The file grew since stat(), read the rest too
+        with os.fdopen(fd, "rb", closefd=False) as f:
+            data += f.read()
+    return data
+
+
+@cache
+def _json_backend() -> tuple[Callable[[bytes], Any], type[Exception]]:
+    # orjson (the `fast` extra) parses bytes directly and is several times
+    # faster than the stdlib module
+    try:
+        import orjson
+    except ImportError:
+        import json
+
+        return json.loads, json.JSONDecodeError
+
+    return orjson.loads, orjson.JSONDecodeError
+
+
+@cache
+def _toml_backend() -> tuple[Callable[[str], Any], type[Exception]]:
+    # rtoml (the `fast` extra) is a Rust parser, tomllib is pure Python
+    try:
+        import rtoml
+    except ImportError:
+        import tomllib
+
+        return tomllib.loads, tomllib.TOMLDecodeError
+
+    return rtoml.loads, rtoml.TomlParsingError
+
+
+@cache
+def _yaml_loader() -> type:
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+
+        warnings.warn(
+            "PyYAML was built without LibYAML, YAML configs will load slowly",
+            RuntimeWarning,
+        )
+
+    return loader
+
+
+def _yaml_loads(data: _Source) -> Any:
+    import yaml
+
+    return yaml.load(data, Loader=_yaml_loader())
+
+
 def _build_project_config(raw: Mapping[str, Any]) -> ProjectConfig:
     tasks = {}
 
-    if not "tasks" in raw:
+    if "tasks" not in raw:
         raise ConfigError(f"Missing 'tasks' field")
 
     if not isinstance(raw["tasks"], Mapping):
@@ -88,7 +255,9 @@ def _build_project_config(raw: Mapping[str, Any]) -> ProjectConfig:
         if not isinstance(task_id, str):
             raise ConfigError(f"Task id must be a string, got {type(task_id)}")
 
-        task_id_norm = task_id.strip()
+        # Ids are interned so every dict/set holding them shares one object
+        # and equality checks short-circuit on identity
+        task_id_norm = sys.intern(task_id.strip())
 
         if len(task_id_norm) < 1:
             raise ConfigError(f"A task id can't be empty")
@@ -99,47 +268,50 @@ def _build_project_config(raw: Mapping[str, Any]) -> ProjectConfig:
         task_config = _build_task_config(task_id_norm, fields)
         tasks[task_id_norm] = task_config
 
+    task_id_set = frozenset(tasks)
     for task in tasks.values():
-        for dep in task.deps:
-            if dep not in tasks:
-                raise ConfigError(f"Task '{task.id}' has unknown dependency '{dep}'")
+        missing = [dep for dep in task.deps if dep not in task_id_set]
+        if missing:
+            names = ", ".join(f"'{dep}'" for dep in missing)
+            raise ConfigError(f"Task '{task.id}' has unknown dependencies: {names}")
 
     return ProjectConfig(tasks=tasks)
 
 
 def _build_task_config(task_id: str, fields: Mapping[str, Any]) -> TaskConfig:
-    keys = {"command", "deps", "env", "working_dir"}
+    # Each field is fetched and normalized exactly once
     deps = []
-    seen = set()
     env = {}
     working_dir = None
 
-    for field in fields.keys():
-        if field not in keys:
-            raise ConfigError(f"{task_id}: Can't process: {field}")
+    unknown = fields.keys() - _ALLOWED_TASK_FIELDS
+    if unknown:
+        names = ", ".join(str(field) for field in sorted(unknown, key=str))
+        raise ConfigError(f"{task_id}: Can't process: {names}")
 
-    if not "command" in fields:
+    if "command" not in fields:
         raise ConfigError(f"{task_id}: missing 'command'")
 
-    if not isinstance(fields["command"], str):
+    raw_command = fields["command"]
+    if not isinstance(raw_command, str):
         raise ConfigError(f"{task_id}: The command should be a string")
 
-    if len(fields["command"].strip()) < 1:
+    command = raw_command.strip()
+    if len(command) < 1:
         raise ConfigError(f"{task_id}: Command missing")
 
-    command = fields["command"].strip()
-
     if "deps" in fields:
-        if not isinstance(fields["deps"], list):
+        raw_deps = fields["deps"]
+        if not isinstance(raw_deps, list):
             raise ConfigError(f"{task_id}: Dependencies should be in a list.")
 
-        for item in fields["deps"]:
+        for item in raw_deps:
             if not isinstance(item, str):
                 raise ConfigError(
                     f"{task_id}: {item} should be a string in the dependency list"
                 )
 
-            dep = item.strip()
+            dep = sys.intern(item.strip())
 
             if len(dep) < 1:
                 raise ConfigError(f"{task_id}: A dependency is empty")
@@ -147,38 +319,37 @@ def _build_task_config(task_id: str, fields: Mapping[str, Any]) -> TaskConfig:
             if dep == task_id:
                 raise ConfigError(f"{task_id}: A task cannot be self dependent")
 
-            # Allows to ignore duplicates dependency
-            if dep in seen:
-                continue
-
             deps.append(dep)
-            seen.add(dep)
 
     if "env" in fields:
-        if not isinstance(fields["env"], Mapping):
+        raw_env = fields["env"]
+        if not isinstance(raw_env, Mapping):
             raise ConfigError(f"{task_id}: Env should be a mapping")
 
-        for key, item in fields["env"].items():
+        for key, item in raw_env.items():
             if not isinstance(key, str):
                 raise ConfigError(f"{task_id}: {key} should be a string")
 
-            if len(key.strip()) < 1:
+            key_norm = key.strip()
+            if len(key_norm) < 1:
                 raise ConfigError(f"{task_id}: A key can't be empty")
 
             if not isinstance(item, str):
                 raise ConfigError(f"{task_id}: {item} should be a string")
 
-            env[key.strip()] = item
+            env[sys.intern(key_norm)] = item
 
     if "working_dir" in fields:
-        if not isinstance(fields["working_dir"], str):
+        raw_working_dir = fields["working_dir"]
+        if not isinstance(raw_working_dir, str):
             raise ConfigError(f"{task_id}: The working_dir should be a string")
 
-        if len(fields["working_dir"].strip()) < 1:
+        working_dir = raw_working_dir.strip()
+        if len(working_dir) < 1:
             raise ConfigError(
                 f"{task_id}: Please provide a string or remove this field"
             )
 
-        working_dir = fields["working_dir"].strip()
-
-    return TaskConfig(task_id, command, deps, env, working_dir)
+    # Duplicate deps are ignored, keeping the first occurrence's position
+    unique_deps = tuple(dict.fromkeys(deps))
+    return TaskConfig(task_id, command, unique_deps, env, working_dir)
@@ -1,44 +1,83 @@
-from dataclasses import dataclass
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Mapping
 
+# Anything the shell would interpret: operators, redirections, expansions,
+# globs, quoting, comments and multi-line scripts
+_SHELL_META_RE = re.compile(r"[|&;<>$`\\(){}\[\]*?~!#\"'\n]")
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class TaskConfig:
     id: str
     command: str
-    deps: list[str]
-    env: dict[str, str]
+    deps: tuple[str, ...]
+    env: Mapping[str, str]
     working_dir: str | None
+    # Program + args when `command` needs no shell, None otherwise
+    argv: tuple[str, ...] | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "argv", _split_simple_command(self.command))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProjectConfig:
     tasks: dict[str, TaskConfig]
+    _sorted_ids: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_sorted_ids", tuple(sorted(self.tasks)))
 
     def __iter__(self):
-        for tasks_id in sorted(self.tasks):
+        for tasks_id in self._sorted_ids:
             yield self.tasks[tasks_id]
 
     def __len__(self):
         return len(self.tasks)
 
     def has_task(self, id: str) -> bool:
-        return True if id in self.tasks else False
+        return id in self.tasks
 
     def get_task(self, id: str) -> TaskConfig:
-        if not self.has_task(id):
-            raise KeyError(id)
-
-        return self.tasks[id]
+        try:
+            return self.tasks[id]
+        except KeyError:
+            raise KeyError(id) from None
 
     def tasks_ids(self) -> list[str]:
-        return sorted(self.tasks.keys())
+        return list(self._sorted_ids)
 
 
 class ConfigError(Exception):
-    def __init__(self, *args: object) -> None:
+    def __init__(
+        self,
+        *args: object,
+        path: str | os.PathLike[str] | None = None,
+        line: int | None = None,
+        column: int | None = None,
+    ) -> None:
         super().__init__(*args)
+        # Where the problem is, when known; line and column are 1-based
+        self.path = path
+        self.line = line
+        self.column = column
 
 
 class UnsupportedConfigFormatError(ConfigError):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
+
+
+def _split_simple_command(command: str) -> tuple[str, ...] | None:
+    if os.name != "posix" or _SHELL_META_RE.search(command):
+        return None
+
+    argv = tuple(shlex.split(command))
+    # `VAR=value cmd` is a shell assignment, not a program name
+    if not argv or "=" in argv[0]:
+        return None
+
+    return argv
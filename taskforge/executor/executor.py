@@ -1,76 +1,173 @@
+import heapq
 import os
 import subprocess
+import sys
+import tempfile
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import IO
 
-from taskforge.config import ProjectConfig
+from taskforge.config import ProjectConfig, TaskConfig
 from taskforge.graph import TaskGraph
 
 from .types import RunResult, TaskResult
 
 
+def _reap(proc: subprocess.Popen) -> tuple[float | None, int | None]:
+    # Returns (cpu seconds, peak RSS in KiB) of the child where wait4 exists
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return None, None
+
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    max_rss = usage.ru_maxrss
+    if sys.platform == "darwin":  # reported in bytes there
+        max_rss //= 1024
+    return usage.ru_utime + usage.ru_stime, max_rss
+
+
 class Executor:
-    def __init__(self, project: ProjectConfig, graph: TaskGraph):
+    def __init__(
+        self,
+        project: ProjectConfig,
+        graph: TaskGraph,
+        *,
+        max_workers: int | None = 1,
+        capture: bool = False,
+    ):
         self.project = project
         self.graph = graph
+        # None means one worker per CPU, like concurrent.futures
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Without capture, tasks inherit our stdout/stderr and results hold ""
+        self.capture = capture
+        # Snapshot once so every task sees the same base environment
+        self._base_env = dict(os.environ)
+
+    def _run_parallel(self, order: list[str], *, fail_fast: bool) -> RunResult:
+        # Ready tasks are dispatched by their position in `order`, so with a
+        # single worker the execution order is exactly the topological order.
+        position = {tid: i for i, tid in enumerate(order)}
+        children = self.graph.reverse_deps()
+        indegree = self.graph.indegree()
+        remaining = {tid: indegree[tid] for tid in order}
+        ready = [position[tid] for tid in order if remaining[tid] == 0]
+        heapq.heapify(ready)
+
+        # Bit i of a mask stands for order[i]; a task is blocked as soon as
+        # one of its deps failed or was skipped
+        deps_mask = {
+            tid: sum(1 << position[dep] for dep in self.project.get_task(tid).deps)
+            for tid in order
+        }
+        blocked_mask = 0
 
-    def _run(self, order: list[str], *, fail_fast: bool) -> RunResult:
         results: dict[str, TaskResult] = {}
-        failed_list: list[str] = []
         failed_set: set[str] = set()
-        skipped_list: list[str] = []
-        skipped_set: set[str] = set()
-        succeeded_set: set[str] = (
-            set()
-        )  # Unused for now, can be useful with parallel mode
-        processed: set[str] = set()
-        stopped_early: bool = False
-
-        for tid in order:
-            task = self.project.get_task(tid)
-            if any(dep in failed_set or dep in skipped_set for dep in task.deps):
-                skipped_list.append(tid)
-                skipped_set.add(tid)
-                processed.add(tid)
-                continue
+        running: dict[Future[TaskResult], str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while ready or running:
+                while ready and len(running) < self.max_workers:
+                    if fail_fast and failed_set:
+                        break
+                    tid = order[heapq.heappop(ready)]
+                    task = self.project.get_task(tid)
+                    running[pool.submit(self._run_one, task)] = tid
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(finished, key=lambda f: position[running[f]]):
+                    tid = running.pop(future)
+                    result = future.result()
+                    results[tid] = result
+                    if result.returncode != 0:
+                        failed_set.add(tid)
+                        blocked_mask |= 1 << position[tid]
+
+                    # Release children; a child whose deps failed or were
+                    # skipped is skipped too, and releases its own children.
+                    settled = [tid]
+                    while settled:
+                        for child in children[settled.pop()]:
+                            if child not in remaining:
+                                continue
+                            remaining[child] -= 1
+                            if remaining[child] > 0:
+                                continue
+                            if deps_mask[child] & blocked_mask:
+                                blocked_mask |= 1 << position[child]
+                                settled.append(child)
+                            else:
+                                heapq.heappush(ready, position[child])
+
+        # Dependency skips plus, with fail-fast, everything never dispatched.
+        skipped_list = [tid for tid in order if tid not in results]
+        failed_list = [tid for tid in order if tid in failed_set]
+        ordered_results = {tid: results[tid] for tid in order if tid in results}
+
+        return RunResult(order, ordered_results, failed_list, skipped_list)
+
+    def _run_one(self, task: TaskConfig) -> TaskResult:
+        env = {**self._base_env, **task.env} if task.env else self._base_env
+        # Captured output goes to temp files rather than pipes, so the child
+        # can be reaped with wait4 without draining pipes concurrently
+        with ExitStack() as stack:
+            if self.capture:
+                out = stack.enter_context(tempfile.TemporaryFile("w+"))
+                err = stack.enter_context(tempfile.TemporaryFile("w+"))
+            else:
+                out = err = None
 
             start = time.monotonic()
-            result = subprocess.run(
-                task.command,
-                shell=True,
-                cwd=task.working_dir or None,
-                env={**os.environ, **task.env},
-                capture_output=True,
-                text=True,
-            )
+            proc = self._spawn(task, env, out, err)
+            cpu_s, max_rss_kb = _reap(proc)
             duration = time.monotonic() - start
 
-            results[tid] = TaskResult(
-                tid, result.returncode, result.stdout, result.stderr, duration
-            )
+            stdout = stderr = ""
+            if out is not None and err is not None:
+                out.seek(0)
+                err.seek(0)
+                stdout, stderr = out.read(), err.read()
 
-            if result.returncode == 0:
-                succeeded_set.add(tid)
-                processed.add(tid)
-            else:
-                failed_list.append(tid)
-                failed_set.add(tid)
-                processed.add(tid)
-                if fail_fast:
-                    stopped_early = True
-                    break
+        return TaskResult(
+            task.id, proc.returncode, stdout, stderr, duration, cpu_s, max_rss_kb
+        )
+
+    def _spawn(
+        self,
+        task: TaskConfig,
+        env: dict[str, str],
+        stdout: IO[str] | None,
+        stderr: IO[str] | None,
+    ) -> subprocess.Popen:
+        popen_kwargs = dict(
+            cwd=task.working_dir or None,
+            env=env,
+            stdout=stdout,
+            stderr=stderr,
+        )
 
-        if stopped_early:
-            for tid in order:
-                if tid not in processed:
-                    skipped_list.append(tid)
-                    skipped_set.add(tid)
+        if task.argv is None:
+            return subprocess.Popen(task.command, shell=True, **popen_kwargs)
 
-        return RunResult(order, results, failed_list, skipped_list)
+        # Simple commands are exec'd directly, skipping the /bin/sh layer.
+        # Anything exec refuses falls back to the shell, which handles it as
+        # before: builtins (cd, exit, ...) have no binary, scripts without a
+        # shebang run under sh, and non-executable files exit with 126.
+        try:
+            return subprocess.Popen(task.argv, **popen_kwargs)
+        except OSError:
+            return subprocess.Popen(task.command, shell=True, **popen_kwargs)
 
     def run_all(self, *, fail_fast: bool = True) -> RunResult:
         order = self.graph.topo_order()
-        return self._run(order, fail_fast=fail_fast)
+        return self._run_parallel(order, fail_fast=fail_fast)
 
     def run_target(self, target: str, *, fail_fast: bool = True) -> RunResult:
         order = self.graph.subgraph_order(target)
-        return self._run(order, fail_fast=fail_fast)
+        return self._run_parallel(order, fail_fast=fail_fast)
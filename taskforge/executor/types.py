@@ -8,6 +8,8 @@ class TaskResult:
     stdout: str
     stderr: str
     duration_s: float
+    cpu_s: float | None = None
+    max_rss_kb: int | None = None
 
 
 @dataclass(frozen=True)
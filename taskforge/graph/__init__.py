@@ -1,4 +1,20 @@
-from .dag import TaskGraph
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from .types import CycleError, GraphError
 
+if TYPE_CHECKING:
+    from .dag import TaskGraph
+
 __all__ = ["TaskGraph", "CycleError", "GraphError"]
+
+
+# TaskGraph is imported on first access, so importing the error types
+# (as the CLI does at startup) doesn't load the graph machinery
+def __getattr__(name: str) -> object:
+    if name == "TaskGraph":
+        from .dag import TaskGraph
+
+        return TaskGraph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,82 +1,172 @@
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass
-from enum import Enum, auto
 
 from taskforge.config.types import ProjectConfig
 
 from .types import CycleError
 
 
-class _Visit(Enum):
-    UNVISITED = auto()
-    VISITING = auto()
-    VISITED = auto()
-
-
+# Internally tasks are integers: their position in the sorted id tuple, so
+# integer order is also name order. Adjacency is stored CSR-style: the deps of
+# node i are _deps_flat[_deps_offsets[i] : _deps_offsets[i + 1]], sorted.
 @dataclass(frozen=True)
 class TaskGraph:
     project: ProjectConfig
-    _deps: dict[str, tuple[str, ...]]
+    _ids: tuple[str, ...]
+    _index: dict[str, int]
+    _deps_flat: array[int]
+    _deps_offsets: array[int]
+    _rdeps_flat: array[int]
+    _rdeps_offsets: array[int]
+    _indeg: array[int]
+    _topo: tuple[str, ...]
+    _rank: array[int]
 
     @classmethod
     def from_project(cls, project: ProjectConfig) -> TaskGraph:
-        deps = {}
-        tasks_ids = project.tasks_ids()
-        for task_id in tasks_ids:
-            task = project.get_task(task_id)
-            deps_tuple = tuple(sorted(task.deps))
-            deps[task_id] = deps_tuple
-
-        return cls(project, deps)
+        ids = tuple(project.tasks_ids())
+        index = {tid: i for i, tid in enumerate(ids)}
+        n = len(ids)
+
+        deps_flat = array("i")
+        deps_offsets = array("i", [0])
+        indeg = array("i", [0]) * n
+        rcount = [0] * n
+        for i, task in enumerate(project):
+            dep_idx = sorted(index[dep] for dep in task.deps)
+            deps_flat.extend(dep_idx)
+            deps_offsets.append(len(deps_flat))
+            indeg[i] = len(dep_idx)
+            for dep in dep_idx:
+                rcount[dep] += 1
+
+        rdeps_offsets = array("i", [0]) * (n + 1)
+        for i in range(n):
+            rdeps_offsets[i + 1] = rdeps_offsets[i] + rcount[i]
+
+        # Filling children in increasing node order keeps each slice sorted
+        rdeps_flat = array("i", [0]) * len(deps_flat)
+        fill = array("i", rdeps_offsets[:n])
+        for i in range(n):
+            for j in range(deps_offsets[i], deps_offsets[i + 1]):
+                dep = deps_flat[j]
+                rdeps_flat[fill[dep]] = i
+                fill[dep] += 1
+
+        # Cycles are rejected here, so every later query is a lookup
+        topo_nodes, left = _kahn(indeg, rdeps_flat, rdeps_offsets)
+        if len(topo_nodes) != n:
+            cycle = _find_cycle(left, deps_flat, deps_offsets)
+            raise CycleError([ids[i] for i in cycle])
+
+        rank = array("i", [0]) * n
+        for position, node in enumerate(topo_nodes):
+            rank[node] = position
+
+        return cls(
+            project,
+            ids,
+            index,
+            deps_flat,
+            deps_offsets,
+            rdeps_flat,
+            rdeps_offsets,
+            indeg,
+            tuple(ids[i] for i in topo_nodes),
+            rank,
+        )
 
     def topo_order(self) -> list[str]:
-        return self._toposort(set(self._deps))
+        return list(self._topo)
 
     def subgraph_order(self, target: str) -> list[str]:
-        if target not in self._deps:
+        if target not in self._index:
             raise KeyError(target)
 
-        needed: set[str] = set()
-        worklist: list[str] = [target]
+        node = self._index[target]
+        deps = self._deps_of(node)
+        if not deps:
+            return [target]
+
+        # Fast path: when every task on the way has exactly one dep, the
+        # discovery order reversed is already the topological order
+        chain = [node]
+        while len(deps) == 1:
+            node = deps[0]
+            chain.append(node)
+            deps = self._deps_of(node)
+        if not deps:
+            return [self._ids[i] for i in reversed(chain)]
+
+        # Only the reachable part of the graph is touched: collect it, then
+        # order it by rank in the cached topological order
+        needed: set[int] = set()
+        worklist: list[int] = [self._index[target]]
 
         while worklist:
-            task_id = worklist.pop()
-            if task_id in needed:
+            node = worklist.pop()
+            if node in needed:
                 continue
-            needed.add(task_id)
-            for dep in self._deps[task_id]:
-                worklist.append(dep)
-
-        return self._toposort(needed)
-
-    def _toposort(self, universe: set[str]) -> list[str]:
-        state = {tid: _Visit.UNVISITED for tid in universe}
-        out: list[str] = []
-        stack: list[str] = []
-        pos: dict[str, int] = {}
-
-        def visit(tid: str) -> None:
-            if state[tid] == _Visit.VISITING:
-                start = pos[tid]
-                raise CycleError(stack[start:] + [tid])
-            if state[tid] == _Visit.VISITED:
-                return
-
-            state[tid] = _Visit.VISITING
-            pos[tid] = len(stack)
-            stack.append(tid)
-
-            for dep in self._deps[tid]:
-                if dep in state:
-                    visit(dep)
-
-            stack.pop()
-            pos.pop(tid)
-            state[tid] = _Visit.VISITED
-            out.append(tid)
-
-        for tid in sorted(universe):
-            visit(tid)
-
-        return out
+            needed.add(node)
+            worklist.extend(self._deps_of(node))
+
+        return [self._ids[i] for i in sorted(needed, key=self._rank.__getitem__)]
+
+    def reverse_deps(self) -> dict[str, list[str]]:
+        ids = self._ids
+        return {
+            tid: [ids[c] for c in _slice(self._rdeps_flat, self._rdeps_offsets, i)]
+            for i, tid in enumerate(ids)
+        }
+
+    def indegree(self) -> dict[str, int]:
+        return dict(zip(self._ids, self._indeg))
+
+    def _deps_of(self, node: int) -> array[int]:
+        return _slice(self._deps_flat, self._deps_offsets, node)
+
+
+def _slice(flat: array[int], offsets: array[int], node: int) -> array[int]:
+    return flat[offsets[node] : offsets[node + 1]]
+
+
+def _kahn(
+    indeg: array[int], rdeps_flat: array[int], rdeps_offsets: array[int]
+) -> tuple[array[int], array[int]]:
+    # Kahn's algorithm. The heap releases the smallest ready node first, which
+    # keeps the order deterministic. Returns the order and the indegrees left,
+    # where any non-zero entry means the node sits on or behind a cycle.
+    left = array("i", indeg)
+    ready = [i for i, n in enumerate(left) if n == 0]
+    heapq.heapify(ready)
+    out = array("i")
+
+    while ready:
+        node = heapq.heappop(ready)
+        out.append(node)
+        for child in _slice(rdeps_flat, rdeps_offsets, node):
+            left[child] -= 1
+            if left[child] == 0:
+                heapq.heappush(ready, child)
+
+    return out, left
+
+
+def _find_cycle(
+    left: array[int], deps_flat: array[int], deps_offsets: array[int]
+) -> list[int]:
+    # Every node left with a non-zero indegree has a dep that is also
+    # left, so following those deps must eventually loop back.
+    path: list[int] = []
+    pos: dict[int, int] = {}
+    node = next(i for i, n in enumerate(left) if n > 0)
+
+    while node not in pos:
+        pos[node] = len(path)
+        path.append(node)
+        node = next(d for d in _slice(deps_flat, deps_offsets, node) if left[d] > 0)
+
+    return path[pos[node] :] + [node]
@@ -0,0 +1,17 @@
+# tests/conftest.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from taskforge.config import clear_project_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_config_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Keep the on-disk config cache out of the user's home during tests
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "cache"))
+    monkeypatch.delenv("TASKFORGE_NO_CACHE", raising=False)
+    clear_project_cache()
@@ -1,13 +1,18 @@
 # tests/test_cli.py
 from __future__ import annotations
 
+import argparse
 import json
+import subprocess
 import sys
 from pathlib import Path
 
 import pytest
 
-from taskforge.cli import run_cli
+from taskforge.cli import CLIContext, run_cli
+from taskforge.cli import commands
+from taskforge.cli.args import _jobs, build_parser
+from taskforge.graph.dag import TaskGraph
 
 
 def _py(code: str) -> str:
@@ -146,3 +151,89 @@ def test_unknown_target_returns_2(
 
     assert code == 2
     assert captured.err != ""
+
+
+def test_run_with_one_job_per_cpu(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cfg = tmp_path / "taskforge.json"
+    log = tmp_path / "log.txt"
+
+    _write_json_config(
+        cfg,
+        {
+            "a": {"command": _py(f"open(r'{log}','a').write('a\\\\n')")},
+            "b": {"command": _py(f"open(r'{log}','a').write('b\\\\n')"), "deps": ["a"]},
+        },
+    )
+
+    code = run_cli(["--config", str(cfg), "run", "--jobs", "0"])
+    captured = capsys.readouterr()
+
+    assert code == 0
+    assert log.read_text(encoding="utf-8").splitlines() == ["a", "b"]
+    assert "OK a" in captured.out
+    assert "OK b" in captured.out
+
+
+def test_jobs_zero_means_one_per_cpu() -> None:
+    assert _jobs("0") is None
+    assert _jobs("3") == 3
+    args = build_parser().parse_args(["run", "--jobs", "0"])
+    assert args.jobs is None
+
+
+@pytest.mark.parametrize("value", ["-1", "two"])
+def test_jobs_rejects_invalid_values(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        _jobs(value)
+
+
+def test_cli_import_defers_graph_and_executor() -> None:
+    code = (
+        "import sys, taskforge.cli.commands; "
+        "print(sorted(m for m in ('taskforge.graph.dag', 'taskforge.executor') "
+        "if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_shared_context_loads_project_and_graph_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cfg = tmp_path / "taskforge.json"
+    _write_json_config(
+        cfg,
+        {
+            "a": {"command": _py("pass")},
+            "b": {"command": _py("pass"), "deps": ["a"]},
+        },
+    )
+    calls = {"load": 0, "graph": 0}
+    real_load = commands.load_project
+    real_from_project = TaskGraph.from_project
+
+    def counting_load(path):
+        calls["load"] += 1
+        return real_load(path)
+
+    def counting_from_project(project):
+        calls["graph"] += 1
+        return real_from_project(project)
+
+    monkeypatch.setattr(commands, "load_project", counting_load)
+    monkeypatch.setattr(TaskGraph, "from_project", counting_from_project)
+
+    ctx = CLIContext(cfg)
+    assert run_cli(["--config", str(cfg), "list"], ctx) == 0
+    assert run_cli(["--config", str(cfg), "run"], ctx) == 0
+    assert run_cli(["--config", str(cfg), "run", "b"], ctx) == 0
+
+    assert calls == {"load": 1, "graph": 1}
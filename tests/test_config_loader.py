@@ -7,13 +7,32 @@
 
 from __future__ import annotations
 
+import builtins
+import importlib.util
 import json
+import mmap
+import os
+import pickle
+import sys
+import types
 from pathlib import Path
 
 import pytest
-
-from taskforge.config.loader import load_project
-from taskforge.config.types import ConfigError, UnsupportedConfigFormatError
+import yaml
+
+from taskforge.config import loader
+from taskforge.config.loader import (
+    _json_backend,
+    _toml_backend,
+    _yaml_loader,
+    clear_project_cache,
+    load_project,
+)
+from taskforge.config.types import (
+    ConfigError,
+    ProjectConfig,
+    UnsupportedConfigFormatError,
+)
 
 
 # -------------------------
@@ -54,6 +73,12 @@ def test_unsupported_extension_raises_unsupported_format(tmp_path: Path) -> None
         load_project(p)
 
 
+def test_extension_is_case_insensitive(tmp_path: Path) -> None:
+    p = write_text(tmp_path / "config.YML", "tasks:\n  a:\n    command: echo a\n")
+    proj = load_project(p)
+    assert set(proj.tasks.keys()) == {"a"}
+
+
 # -------------------------
 # Parse errors are wrapped
 # -------------------------
@@ -77,6 +102,84 @@ def test_invalid_json_is_wrapped_as_config_error(tmp_path: Path) -> None:
         load_project(p)
 
 
+@pytest.mark.parametrize(
+    "name, text, line, column",
+    [
+        ("config.yaml", "tasks:\n  build: [\n", 3, 1),
+        pytest.param(
+            "config.toml",
+            "[tasks.build]\ncommand = \n",
+            2,
+            11,
+            # The expected position is the one tomllib reports
+            marks=pytest.mark.skipif(
+                importlib.util.find_spec("rtoml") is not None,
+                reason="rtoml is the active TOML backend",
+            ),
+        ),
+        ("config.json", '{\n  "tasks": {,}\n}', 2, 13),
+    ],
+)
+def test_parse_error_carries_position(
+    tmp_path: Path, name: str, text: str, line: int, column: int
+) -> None:
+    p = write_text(tmp_path / name, text)
+    with pytest.raises(ConfigError) as e:
+        load_project(p)
+    assert (e.value.line, e.value.column) == (line, column)
+    assert e.value.path == p.resolve()
+    assert f"line {line}, column {column}" in str(e.value)
+
+
+def test_stdlib_json_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "orjson", None)  # makes `import orjson` fail
+    _json_backend.cache_clear()
+    try:
+        good = write_json(tmp_path / "good.json", {"tasks": {"a": {"command": "x"}}})
+        bad = write_text(tmp_path / "bad.json", '{"tasks": ')
+
+        assert load_project(good).tasks_ids() == ["a"]
+        with pytest.raises(ConfigError):
+            load_project(bad)
+    finally:
+        _json_backend.cache_clear()
+
+
+def test_rtoml_backend_is_used_when_installed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import tomllib
+
+    calls: list[str] = []
+
+    class TomlParsingError(ValueError):
+        pass
+
+    def loads(text: str):
+        calls.append(text)
+        try:
+            return tomllib.loads(text)
+        except tomllib.TOMLDecodeError as exc:
+            raise TomlParsingError(str(exc)) from None
+
+    rtoml = types.ModuleType("rtoml")
+    rtoml.loads = loads
+    rtoml.TomlParsingError = TomlParsingError
+    monkeypatch.setitem(sys.modules, "rtoml", rtoml)
+    _toml_backend.cache_clear()
+    try:
+        good = write_text(tmp_path / "good.toml", '[tasks.a]\ncommand = "x"\n')
+        bad = write_text(tmp_path / "bad.toml", "tasks = {")
+
+        assert load_project(good).tasks_ids() == ["a"]
+        with pytest.raises(ConfigError) as e:
+            load_project(bad)
+        assert isinstance(e.value.__cause__, TomlParsingError)
+        assert calls == ['[tasks.a]\ncommand = "x"\n', "tasks = {"]
+    finally:
+        _toml_backend.cache_clear()
+
+
 # -------------------------
 # Top-level shape validation
 # -------------------------
@@ -195,6 +298,16 @@ def test_unknown_task_field_raises(tmp_path: Path) -> None:
         load_project(p)
 
 
+def test_unknown_task_fields_are_all_reported(tmp_path: Path) -> None:
+    p = write_text(
+        tmp_path / "config.yaml",
+        "tasks:\n  build:\n    command: echo hi\n    zzz: 1\n    nope: 1\n    3: x\n",
+    )
+    with pytest.raises(ConfigError) as e:
+        load_project(p)
+    assert "3, nope, zzz" in str(e.value)
+
+
 # -------------------------
 # command validation
 # -------------------------
@@ -268,6 +381,16 @@ def test_unknown_dependency_raises(tmp_path: Path) -> None:
         load_project(p)
 
 
+def test_unknown_dependencies_are_all_reported(tmp_path: Path) -> None:
+    p = write_text(
+        tmp_path / "config.yaml",
+        "tasks:\n" "  a:\n" "    command: echo a\n" "    deps: [b, c]\n",
+    )
+    with pytest.raises(ConfigError) as e:
+        load_project(p)
+    assert "'b'" in str(e.value) and "'c'" in str(e.value)
+
+
 def test_duplicate_deps_are_ignored_and_preserve_order(tmp_path: Path) -> None:
     p = write_text(
         tmp_path / "config.yaml",
@@ -281,7 +404,7 @@ def test_duplicate_deps_are_ignored_and_preserve_order(tmp_path: Path) -> None:
         "    command: echo c\n",
     )
     proj = load_project(p)
-    assert proj.tasks["a"].deps == ["b", "c"]
+    assert proj.tasks["a"].deps == ("b", "c")
 
 
 # -------------------------
@@ -377,10 +500,33 @@ def test_valid_yaml_loads(tmp_path: Path) -> None:
     )
     proj = load_project(p)
     assert set(proj.tasks.keys()) == {"build", "test"}
-    assert proj.tasks["build"].deps == ["test"]
+    assert proj.tasks["build"].deps == ("test",)
     assert proj.tasks["build"].env == {"KEY": "value"}
 
 
+@pytest.mark.skipif(not hasattr(yaml, "CSafeLoader"), reason="PyYAML without LibYAML")
+def test_yaml_uses_libyaml_loader_when_available() -> None:
+    assert _yaml_loader() is yaml.CSafeLoader
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="commands always use cmd.exe")
+def test_simple_commands_are_pre_split(tmp_path: Path) -> None:
+    p = write_text(
+        tmp_path / "config.yaml",
+        "tasks:\n"
+        "  simple:\n"
+        "    command: make -j 4 build\n"
+        "  piped:\n"
+        "    command: echo hi | wc -l\n"
+        "  assign:\n"
+        "    command: FOO=1 make\n",
+    )
+    proj = load_project(p)
+    assert proj.tasks["simple"].argv == ("make", "-j", "4", "build")
+    assert proj.tasks["piped"].argv is None
+    assert proj.tasks["assign"].argv is None
+
+
 def test_valid_json_loads(tmp_path: Path) -> None:
     obj = {
         "tasks": {
@@ -391,7 +537,7 @@ def test_valid_json_loads(tmp_path: Path) -> None:
     p = write_json(tmp_path / "config.json", obj)
     proj = load_project(p)
     assert set(proj.tasks.keys()) == {"a", "b"}
-    assert proj.tasks["b"].deps == ["a"]
+    assert proj.tasks["b"].deps == ("a",)
 
 
 def test_valid_toml_loads(tmp_path: Path) -> None:
@@ -407,4 +553,147 @@ def test_valid_toml_loads(tmp_path: Path) -> None:
     )
     proj = load_project(p)
     assert set(proj.tasks.keys()) == {"a", "b"}
-    assert proj.tasks["b"].deps == ["a"]
+    assert proj.tasks["b"].deps == ("a",)
+
+
+def test_large_yaml_is_mapped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    lines = ["tasks:"]
+    for i in range(2000):
+        lines.append(f"  t{i}:\n    command: echo {i}{' ' * 20}")
+    p = write_text(tmp_path / "config.yaml", "\n".join(lines) + "\n")
+    assert p.stat().st_size > loader._MMAP_THRESHOLD
+
+    seen: list[type] = []
+
+    def spy(path: Path, data: object):
+        seen.append(type(data))
+        return loader._parse_yaml(path, data)
+
+    monkeypatch.setitem(loader._PARSERS, ".yaml", spy)
+
+    proj = load_project(p)
+    assert len(proj) == 2000
+    assert proj.tasks["t1999"].command == "echo 1999"
+    assert seen == [mmap.mmap]
+
+
+def test_large_json_is_read_not_mapped(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    tasks = {f"t{i}": {"command": f"echo {i}{' ' * 20}"} for i in range(2000)}
+    p = write_text(tmp_path / "config.json", json.dumps({"tasks": tasks}))
+    assert p.stat().st_size > loader._MMAP_THRESHOLD
+
+    seen: list[type] = []
+
+    def spy(path: Path, data: object):
+        seen.append(type(data))
+        return loader._parse_json(path, data)
+
+    monkeypatch.setitem(loader._PARSERS, ".json", spy)
+
+    assert len(load_project(p)) == 2000
+    assert seen == [bytes]
+
+
+# -------------------------
+# Caching
+# -------------------------
+
+
+def test_unchanged_file_returns_cached_project(tmp_path: Path) -> None:
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    assert load_project(p) is load_project(p)
+
+
+def test_modified_file_is_reparsed(tmp_path: Path) -> None:
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    first = load_project(p)
+
+    write_text(p, "tasks:\n  b:\n    command: echo bb\n")
+    second = load_project(p)
+
+    assert first is not second
+    assert set(second.tasks.keys()) == {"b"}
+
+
+def test_process_cache_is_bounded(tmp_path: Path) -> None:
+    paths = [
+        write_text(tmp_path / f"c{i}.yaml", "tasks:\n  a:\n    command: echo a\n")
+        for i in range(65)
+    ]
+    first = load_project(paths[0])
+    for p in paths[1:]:
+        load_project(p)
+
+    # The oldest entry was evicted; the disk cache still avoids a reparse
+    reloaded = load_project(paths[0])
+    assert reloaded is not first
+    assert reloaded == first
+
+
+def test_disk_cache_survives_process_cache_reset(tmp_path: Path) -> None:
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    first = load_project(p)
+    assert list((tmp_path / "cache" / "taskforge").glob("*.pkl"))
+
+    clear_project_cache()
+    second = load_project(p)
+
+    assert second is not first
+    assert second == first
+    assert second.tasks_ids() == ["a"]
+
+
+def test_disk_cache_can_be_disabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("TASKFORGE_NO_CACHE", "1")
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    load_project(p)
+    assert not (tmp_path / "cache" / "taskforge").exists()
+
+
+def test_malformed_disk_cache_entry_is_a_miss(tmp_path: Path) -> None:
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    load_project(p)
+    (entry,) = (tmp_path / "cache" / "taskforge").glob("*.pkl")
+    stamp, _ = pickle.loads(entry.read_bytes())
+    entry.write_bytes(pickle.dumps((stamp, ProjectConfig(tasks={"a": "echo a"}))))
+
+    clear_project_cache()
+    project = load_project(p)
+
+    assert project.get_task("a").command == "echo a"
+
+
+def test_cold_load_opens_config_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    p = write_text(tmp_path / "config.yaml", "tasks:\n  a:\n    command: echo a\n")
+    config = p.resolve()
+    opened: list[str] = []
+    real_open, real_os_open = builtins.open, os.open
+
+    def spy_open(file, *args, **kwargs):
+        if Path(file) == config:
+            opened.append("open")
+        return real_open(file, *args, **kwargs)
+
+    def spy_os_open(file, *args, **kwargs):
+        if Path(file) == config:
+            opened.append("os.open")
+        return real_os_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", spy_open)
+    monkeypatch.setattr(os, "open", spy_os_open)
+
+    load_project(p)
+    assert opened == ["os.open"]
+    assert list((tmp_path / "cache" / "taskforge").glob("*.pkl"))
+
+    # A warm process-cache miss only needs the head for the stamp
+    opened.clear()
+    clear_project_cache()
+    load_project(p)
+    assert opened == ["open"]
@@ -14,7 +14,7 @@ def _proj(spec: dict[str, list[str]]) -> ProjectConfig:
         tasks[task_id] = TaskConfig(
             id=task_id,
             command=f"echo {task_id}",
-            deps=list(deps),
+            deps=tuple(deps),
             env={},
             working_dir=None,
         )
@@ -77,6 +77,19 @@ def test_topo_dep_input_order_does_not_matter():
     assert g1.topo_order() == g2.topo_order() == ["B", "C", "A"]
 
 
+def test_topo_releases_smallest_ready_task_first():
+    # B becomes ready after A and still runs before the already-ready Z
+    project = _proj(
+        {
+            "A": [],
+            "B": ["A"],
+            "Z": [],
+        }
+    )
+    g = TaskGraph.from_project(project)
+    assert g.topo_order() == ["A", "B", "Z"]
+
+
 def test_cycle_detection_two_node_cycle():
     project = _proj(
         {
@@ -84,9 +97,8 @@ def test_cycle_detection_two_node_cycle():
             "B": ["A"],
         }
     )
-    g = TaskGraph.from_project(project)
     with pytest.raises(CycleError):
-        g.topo_order()
+        TaskGraph.from_project(project)
 
 
 def test_subgraph_order_target_includes_only_transitive_deps():
@@ -112,11 +124,42 @@ def test_subgraph_order_leaf_returns_itself():
 
 def test_cycle_error_includes_closed_loop_path():
     project = _proj({"A": ["B"], "B": ["A"]})
-    g = TaskGraph.from_project(project)
-
     with pytest.raises(CycleError) as e:
-        g.topo_order()
+        TaskGraph.from_project(project)
 
     cycle = e.value.cycle
     assert len(cycle) >= 3
     assert cycle[0] == cycle[-1]
+
+
+def test_topo_deep_chain_does_not_recurse():
+    n = 5000
+    spec = {f"t{i:05d}": [f"t{i + 1:05d}"] for i in range(n - 1)}
+    spec[f"t{n - 1:05d}"] = []
+    g = TaskGraph.from_project(_proj(spec))
+
+    order = g.topo_order()
+
+    assert order[0] == f"t{n - 1:05d}"
+    assert order[-1] == "t00000"
+    assert len(order) == n
+
+
+def test_cycle_error_reports_cycle_behind_acyclic_prefix():
+    project = _proj({"A": ["B"], "B": ["C"], "C": ["D"], "D": ["B"]})
+    with pytest.raises(CycleError) as e:
+        TaskGraph.from_project(project)
+
+    assert e.value.cycle == ["B", "C", "D", "B"]
+
+
+def test_subgraph_order_linear_chain():
+    project = _proj({"A": ["B"], "B": ["C"], "C": [], "D": ["A"]})
+    g = TaskGraph.from_project(project)
+    assert g.subgraph_order("A") == ["C", "B", "A"]
+
+
+def test_cycle_outside_target_subgraph_is_rejected_at_build():
+    project = _proj({"A": [], "B": ["C"], "C": ["B"]})
+    with pytest.raises(CycleError):
+        TaskGraph.from_project(project)
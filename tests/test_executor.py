@@ -1,6 +1,7 @@
 # tests/test_executor.py
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
@@ -31,7 +32,7 @@ def _project(tasks: dict[str, dict]) -> ProjectConfig:
         built[tid] = TaskConfig(
             id=tid,
             command=spec["command"],
-            deps=list(spec.get("deps", [])),
+            deps=tuple(spec.get("deps", [])),
             env=dict(spec.get("env", {})),
             working_dir=spec.get("working_dir"),
         )
@@ -80,6 +81,47 @@ def test_env_is_applied(tmp_path: Path) -> None:
     assert rr.results["envtask"].returncode == 0
 
 
+def test_env_is_snapshotted_at_construction(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("TF_LATE", raising=False)
+    project = _project(
+        {
+            "late": {
+                "command": _py(
+                    "import os; raise SystemExit(2 if 'TF_LATE' in os.environ else 0)"
+                ),
+            }
+        }
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph)
+    monkeypatch.setenv("TF_LATE", "1")
+
+    rr = ex.run_all()
+
+    assert rr.results["late"].returncode == 0
+
+
+def test_output_is_captured_only_on_request(tmp_path: Path) -> None:
+    project = _project(
+        {
+            "talk": {
+                "command": _py("import sys; print('hello'); sys.stderr.write('oops')")
+            }
+        }
+    )
+    graph = TaskGraph.from_project(project)
+
+    captured = Executor(project, graph, capture=True).run_all()
+    inherited = Executor(project, graph).run_all()
+
+    assert captured.results["talk"].stdout.strip() == "hello"
+    assert captured.results["talk"].stderr == "oops"
+    assert inherited.results["talk"].stdout == ""
+    assert inherited.results["talk"].stderr == ""
+
+
 def test_working_dir_is_respected(tmp_path: Path) -> None:
     wd = tmp_path / "wd"
     wd.mkdir()
@@ -188,3 +230,129 @@ def test_run_target_executes_only_needed_subgraph(tmp_path: Path) -> None:
     assert list(rr.results.keys()) == ["a", "b", "c"]
     assert "d_extra" not in rr.results
     assert log.read_text(encoding="utf-8").splitlines() == ["a", "b", "c"]
+
+
+def test_independent_tasks_run_concurrently(tmp_path: Path) -> None:
+    # Each task waits for the other's flag file, so they only succeed if both
+    # are running at the same time.
+    script = tmp_path / "rendezvous.py"
+    script.write_text(
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "me, other = Path(sys.argv[1]), Path(sys.argv[2])\n"
+        "me.touch()\n"
+        "deadline = time.monotonic() + 10\n"
+        "while not other.exists() and time.monotonic() < deadline:\n"
+        "    time.sleep(0.01)\n"
+        "raise SystemExit(0 if other.exists() else 1)\n",
+        encoding="utf-8",
+    )
+
+    def rendezvous(me: str, other: str) -> str:
+        exe = str(Path(sys.executable))
+        return f'"{exe}" "{script}" "{tmp_path / me}" "{tmp_path / other}"'
+
+    project = _project(
+        {
+            "a": {"command": rendezvous("a.flag", "b.flag")},
+            "b": {"command": rendezvous("b.flag", "a.flag")},
+            "c": {"deps": ["a", "b"], "command": _py("raise SystemExit(0)")},
+        }
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph, max_workers=2)
+
+    rr = ex.run_all()
+
+    assert rr.failed == []
+    assert rr.skipped == []
+    assert list(rr.results.keys()) == ["a", "b", "c"]
+
+
+def test_parallel_failure_skips_only_dependents(tmp_path: Path) -> None:
+    project = _project(
+        {
+            "a_fail": {"command": _py("raise SystemExit(4)")},
+            "b_dep": {"deps": ["a_fail"], "command": _py("raise SystemExit(0)")},
+            "c_dep": {"deps": ["b_dep"], "command": _py("raise SystemExit(0)")},
+            "d_ind": {"command": _py("raise SystemExit(0)")},
+        }
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph, max_workers=4)
+
+    rr = ex.run_all(fail_fast=False)
+
+    assert rr.failed == ["a_fail"]
+    assert rr.skipped == ["b_dep", "c_dep"]
+    assert list(rr.results.keys()) == ["a_fail", "d_ind"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shell builtins")
+def test_simple_commands_and_shell_builtins(tmp_path: Path) -> None:
+    out = tmp_path / "out.txt"
+    project = _project(
+        {
+            "direct": {"command": f"{sys.executable} -c pass"},
+            "builtin": {"command": "exit 3"},
+            "shell": {"command": f"echo hi > {out}"},
+        }
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph)
+
+    rr = ex.run_all(fail_fast=False)
+
+    assert rr.results["direct"].returncode == 0
+    assert rr.results["builtin"].returncode == 3
+    assert rr.results["shell"].returncode == 0
+    assert out.read_text(encoding="utf-8") == "hi\n"
+
+
+def test_max_workers_none_uses_cpu_count() -> None:
+    project = _project({"a": {"command": _py("pass")}})
+    graph = TaskGraph.from_project(project)
+
+    assert Executor(project, graph, max_workers=None).max_workers == (
+        os.cpu_count() or 1
+    )
+    assert Executor(project, graph, max_workers=3).max_workers == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX exec semantics")
+def test_exec_failures_fall_back_to_the_shell(tmp_path: Path) -> None:
+    noexec = tmp_path / "noexec.sh"
+    noexec.write_text("#!/bin/sh\nexit 0\n", encoding="utf-8")
+    noexec.chmod(0o644)
+    noshebang = tmp_path / "noshebang.sh"
+    noshebang.write_text("exit 4\n", encoding="utf-8")
+    noshebang.chmod(0o755)
+    project = _project(
+        {
+            "noexec": {"command": "./noexec.sh", "working_dir": str(tmp_path)},
+            "noshebang": {"command": "./noshebang.sh", "working_dir": str(tmp_path)},
+        }
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph)
+
+    rr = ex.run_all(fail_fast=False)
+
+    assert rr.results["noexec"].returncode == 126
+    assert rr.results["noshebang"].returncode == 4
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="os.wait4 is POSIX only")
+def test_child_resource_usage_is_recorded(tmp_path: Path) -> None:
+    project = _project(
+        {"spin": {"command": _py("sum(i * i for i in range(200000))")}}
+    )
+    graph = TaskGraph.from_project(project)
+    ex = Executor(project, graph)
+
+    rr = ex.run_all()
+
+    result = rr.results["spin"]
+    assert result.returncode == 0
+    assert result.cpu_s is not None and result.cpu_s > 0
+    assert result.max_rss_kb is not None and result.max_rss_kb > 0